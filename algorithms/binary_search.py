@@ -14,28 +14,19 @@ def binary_search(l: list[T], item: T) -> int:
     Best Case Complexity: O(1), when middle index contains item.
     Worst Case Complexity: O(log(N)), where N is the length of l.
     """
-    return _binary_search_aux(l, item, 0, len(l))
+    # lo: smallest index where the return value could be.
+    # hi: largest index where the return value could be.
+    lo, hi = 0, len(l) - 1
+    while lo <= hi:
+        mid = (lo + hi) >> 1
+        value = l[mid]
+        if value == item:
+            return mid
+        elif value < item:
+            # Item would be after mid
+            lo = mid + 1
+        else:
+            # Item would be before mid
+            hi = mid - 1
 
-def _binary_search_aux(l: list[T], item: T, lo: int, hi: int) -> int:
-    """
-    Auxilliary method used by binary search.
-    lo: smallest index where the return value could be.
-    hi: largest index where the return value could be.
-    """
-    # Edited code: added if statement and raise KeyError
-    if lo == hi:
-        if l[lo] == item:
-            return lo
-        raise KeyError("Item not in list!")
-
-    mid = (hi + lo) // 2
-    if l[mid] > item:
-        # Item would be before mid
-        return _binary_search_aux(l, item, lo, mid)
-    elif l[mid] < item:
-        # Item would be after mid
-        return _binary_search_aux(l, item, mid+1, hi)
-    elif l[mid] == item:
-        return mid
-
-    raise ValueError(f"Comparison operator poorly implemented {item} and {l[mid]} cannot be compared.")
+    raise KeyError("Item not in list!")
@@ -33,6 +33,9 @@ class LinearProbeTable(Generic[K, V]):
 
     HASH_BASE = 31
 
+    # Shared by every table: (HASH_BASE, table size) -> hash multipliers, extended as longer keys are hashed.
+    _COEFFICIENTS: dict[tuple[int, int], list[int]] = {}
+
     def __init__(self, sizes=None) -> None:
         """
         Initialise the Hash Table.
@@ -43,6 +46,20 @@ class LinearProbeTable(Generic[K, V]):
         self.array:ArrayR[tuple[K, V]] = ArrayR(self.TABLE_SIZES[self.size_index])
         self.count = 0
 
+    def _hash_coefficients(self, table_size: int, length: int) -> list[int]:
+        """
+        Multipliers for the first `length` characters of a key in a table of this size.
+
+        :complexity: O(1) amortised, O(length) when the cached list needs extending.
+        """
+        key = (self.HASH_BASE, table_size)
+        coefficients = self._COEFFICIENTS.get(key)
+        if coefficients is None:
+            coefficients = self._COEFFICIENTS[key] = [31415]
+        while len(coefficients) < length:
+            coefficients.append(coefficients[-1] * self.HASH_BASE % (table_size - 1))
+        return coefficients
+
 
     def hash(self, key: K) -> int:
         """
@@ -52,10 +69,11 @@ class LinearProbeTable(Generic[K, V]):
         """
 
         value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
+        table_size = self.table_size
+        # Iterating over bytes yields ints directly, saving an ord() per character.
+        key_bytes = key.encode()
+        for byte, a in zip(key_bytes, self._hash_coefficients(table_size, len(key_bytes))):
+            value = (byte + a * value) % table_size
         return value
 
 
@@ -105,11 +123,7 @@ class LinearProbeTable(Generic[K, V]):
 
         :complexity: O(N) where N is self.table_size.
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][0])
-        return res
+        return [item[0] for item in self.array if item is not None]
 
     def values(self) -> list[V]:
         """
@@ -117,11 +131,7 @@ class LinearProbeTable(Generic[K, V]):
 
         :complexity: O(N) where N is self.table_size.
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][1])
-        return res
+        return [item[1] for item in self.array if item is not None]
 
     def __contains__(self, key: K) -> bool:
         """
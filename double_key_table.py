@@ -2,21 +2,22 @@ from __future__ import annotations
 
 from typing import Generic, TypeVar, Iterator
 from data_structures.hash_table import LinearProbeTable, FullError
-from data_structures.referential_array import ArrayR
 
 K1 = TypeVar('K1')
 K2 = TypeVar('K2')
 V = TypeVar('V')
 
+# Marks a top-level slot whose internal table has been deleted.
+# Lookups probe past it, inserts of a new top-level key can reuse it.
+TOMBSTONE = object()
+
 class DoubleKeyTable(Generic[K1, K2, V]):
     """
     Double Hash Table.
 
     Type Arguments:
-        - K1:   1st Key Type. In most cases should be string.
-                Otherwise `hash1` should be overwritten.
-        - K2:   2nd Key Type. In most cases should be string.
-                Otherwise `hash2` should be overwritten.
+        - K1:   1st Key Type. Must be hashable, in most cases should be string.
+        - K2:   2nd Key Type. Must be hashable, in most cases should be string.
         - V:    Value Type.
 
     Unless stated otherwise, all methods have O(1) complexity.
@@ -30,7 +31,7 @@ class DoubleKeyTable(Generic[K1, K2, V]):
     def __init__(self, sizes:list|None=None, internal_sizes:list|None=None) -> None:
         """
         Complexity: The best-case=worst is O(1) no matter the input. The method only needs to
-        initialise the array, count, top and bottom sizes attributes.
+        initialise the array, counts, top and bottom sizes attributes.
         """
         self.top_size = self.TABLE_SIZES
         self.bottom_size = self.TABLE_SIZES
@@ -40,37 +41,31 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         if internal_sizes is not None:
             self.bottom_size = internal_sizes
         self.top_size_index = 0
-        self.array = ArrayR(self.top_size[self.top_size_index])
+        self.array = [None] * self.top_size[self.top_size_index]
         self.count = 0
+        self.top_level_count = 0  # number of occupied slots in the top-level table
+        self.tombstone_count = 0  # number of deleted slots in the top-level table
 
 
     def hash1(self, key: K1) -> int:
         """
         Hash the 1st key for insert/retrieve/update into the hashtable.
+        Uses Python's built-in hash, so any hashable key works.
 
-        :complexity: O(len(key))
+        :complexity: O(len(key)) the first time a string is hashed, O(1) afterwards
+        as Python caches the hash on the string.
         """
-
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
-        return value
+        return hash(key) % self.table_size
 
     def hash2(self, key: K2, sub_table: LinearProbeTable[K2, V]) -> int:
         """
         Hash the 2nd key for insert/retrieve/update into the hashtable.
+        Uses Python's built-in hash, so any hashable key works.
 
-        :complexity: O(len(key))
+        :complexity: O(len(key)) the first time a string is hashed, O(1) afterwards
+        as Python caches the hash on the string.
         """
-
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % sub_table.table_size
-            a = a * self.HASH_BASE % (sub_table.table_size - 1)
-        return value
+        return hash(key) % sub_table.table_size
 
 
     def _linear_probe(self, key1: K1, key2: K2, is_insert: bool) -> tuple[int, int]:
@@ -87,38 +82,49 @@ class DoubleKeyTable(Generic[K1, K2, V]):
          or to find that the key doesn't exist in the table.
         """
         pos1 = self.hash1(key1)
+        table_size = self.table_size
+        tombstone = None  # first deleted slot passed, reused if a new top-level key is inserted
 
-        for _ in range(self.table_size):
-            if self.array[pos1] is None:
-
-                if is_insert:
-                    if key2 is None:  # __delitem__ reinserting
-                        return pos1
+        for _ in range(table_size):
+            item = self.array[pos1]
+            if item is None:
+                break
 
-                    # create internal table
-                    internal_array = LinearProbeTable(self.bottom_size)
-                    internal_array.hash = lambda k: self.hash2(k, internal_array)
-                    self.array[pos1] = [key1, internal_array]
-                    pos2 = internal_array._linear_probe(key2, is_insert)
-                    return pos1, pos2
-                else:
-                    raise KeyError(key1)
+            elif item is TOMBSTONE:
+                if tombstone is None:
+                    tombstone = pos1
 
-            elif self.array[pos1][0] == key1:
+            elif item[0] == key1:
                 if key2 is None:  # for keys()
                     return pos1
-                internal_array = self.array[pos1][1]
+                internal_array = item[1]
                 pos2 = internal_array._linear_probe(key2, is_insert)
                 return pos1, pos2
 
-            else:
-                pos1 = (pos1+1) % self.table_size
+            pos1 += 1
+            if pos1 == table_size:
+                pos1 = 0
 
-        if is_insert:
-            raise FullError("Table is full!")
         else:
+            # probed the entire table without finding an empty slot
+            if is_insert and tombstone is None:
+                raise FullError("Table is full!")
+
+        if not is_insert:
             raise KeyError(key1)
 
+        if tombstone is not None:
+            pos1 = tombstone
+            self.tombstone_count -= 1
+
+        # create internal table
+        internal_array = LinearProbeTable(self.bottom_size)
+        internal_array.hash = lambda k: self.hash2(k, internal_array)
+        self.array[pos1] = [key1, internal_array]
+        self.top_level_count += 1
+        pos2 = internal_array._linear_probe(key2, is_insert)
+        return pos1, pos2
+
 
     def iter_keys(self, key:K1|None=None) -> Iterator[K1|K2]:
         """
@@ -132,7 +138,7 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         """
         if key is None:
             for item in self.array:
-                if item is not None:
+                if item is not None and item is not TOMBSTONE:
                     yield item[0]
 
         else:
@@ -152,21 +158,12 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         Worst-case is O(n), where n is the size of the internal hash table. This occurs when the internal array is 
         completely full, so it has to probe n times before finding the matching key.
         """
-        keys_list = []
-
         if key is None:
-            for item in self.array:
-                if item is not None:
-                    keys_list.append(item[0])
+            return [item[0] for item in self.array if item is not None and item is not TOMBSTONE]
 
-        else:
-            pos1 = self._linear_probe(key, None, False)
-            internal_array = self.array[pos1][1]
-            for item in internal_array.array:
-                if item is not None:
-                    keys_list.append(item[0])
-
-        return keys_list
+        pos1 = self._linear_probe(key, None, False)
+        internal_array = self.array[pos1][1]
+        return [item[0] for item in internal_array.array if item is not None]
 
     def iter_values(self, key:K1|None=None) -> Iterator[V]:
         """
@@ -180,12 +177,11 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         completely full, so it has to probe n times before finding the matching key.
         """
         if key is None:
-            for item1 in self.array:
-                if item1 is not None:
-                    internal_array = item1[1]
-                    for item2 in internal_array.array:
-                        if item2 is not None:
-                            yield item2[1]
+            yield from (
+                item2[1]
+                for item1 in self.array if item1 is not None and item1 is not TOMBSTONE
+                for item2 in item1[1].array if item2 is not None
+            )
 
         else:
             pos1 = self._linear_probe(key, None, False)
@@ -204,24 +200,16 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         Worst-case is O(n), where n is the size of the internal hash table. This occurs when the internal array is 
         completely full, so it has to probe n times before finding the matching key.
         """
-        values_list = []
-
         if key is None:
-            for item1 in self.array:
-                if item1 is not None:
-                    internal_array = item1[1]
-                    for item2 in internal_array.array:
-                        if item2 is not None:
-                            values_list.append(item2[1])
+            return [
+                item2[1]
+                for item1 in self.array if item1 is not None and item1 is not TOMBSTONE
+                for item2 in item1[1].array if item2 is not None
+            ]
 
-        else:
-            pos1 = self._linear_probe(key, None, False)
-            internal_array = self.array[pos1][1]
-            for item in internal_array.array:
-                if item is not None:
-                    values_list.append(item[1])
-
-        return values_list
+        pos1 = self._linear_probe(key, None, False)
+        internal_array = self.array[pos1][1]
+        return [item[1] for item in internal_array.array if item is not None]
 
 
     def __contains__(self, key: tuple[K1, K2]) -> bool:
@@ -260,18 +248,12 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         """
         pos1, pos2 = self._linear_probe(key[0], key[1], True)
         internal_array = self.array[pos1][1]
-        try:
-            internal_array[key[1]]
-        except KeyError:  # position in internal table is None, means new pair
+        if internal_array.array[pos2] is None:  # position in internal table is None, means new pair
             self.count += 1
 
         internal_array[key[1]] = data  # calls internal array's __setitem__, so should do internal rehash
 
-        key1_counter = 0
-        for item in self.array:
-            if item is not None:
-                key1_counter += 1
-        if key1_counter > self.table_size / 2:
+        if self.top_level_count + self.tombstone_count > self.table_size // 2:
             self._rehash()
 
 
@@ -281,60 +263,58 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
         :raises KeyError: when the key doesn't exist.
 
-        Complexity: Best-case is O(1) where the pair is removed from the first index of the internal array. Worst-case is O(m+n), 
-        where m is the number of slots in the hash table, and n is the number of clusters. This will occur when the pair we are 
-        deleting is the only pair in the internal array, and all remaining clusters have to be  reinserted.
+        Complexity: Best-case is O(1) where the pair is removed from the first index of the internal array. Worst-case is
+        O(n+m), where n is the size of the outer table and m is the size of the inner table, from probing for the pair.
+        When the pair is the only one in its internal table, the top-level slot is replaced by a tombstone rather than
+        reinserting the rest of the cluster, so this is O(1).
         """
         pos1, pos2 = self._linear_probe(key[0], key[1], False)
 
         # Remove the element
         # use internal table __delitem__
-        # if only pair, del internal_array and reinsert
+        # if only pair, replace the top-level slot with a tombstone
         # else, only del key2
         internal_array = self.array[pos1][1]
         if len(internal_array) > 1:
             del internal_array[key[1]]
             self.count -= 1
         else:
-            # del bottom-level table and re-insert top-level table cluster
-            self.array[pos1] = None
+            # del bottom-level table, probing carries on past the tombstone so the cluster stays reachable
+            self.array[pos1] = TOMBSTONE
             self.count -=1
-
-            # Start moving over the cluster
-            position = (pos1 + 1) % self.table_size
-            while self.array[position] is not None:
-                key1 = self.array[position][0]
-                internal_array = self.array[position][1]
-                self.array[position] = None
-                # Reinsert
-                newpos = self._linear_probe(key1, None, True)
-                self.array[newpos] = [key1, internal_array]
-                position = (position + 1) % self.table_size
+            self.top_level_count -= 1
+            self.tombstone_count += 1
 
 
     def _rehash(self) -> None:
         """
-        Need to resize table and reinsert all values
+        Need to resize table and reinsert all top-level keys, dropping tombstones.
+        Internal tables are moved across as they are, so no bottom-level key is rehashed.
+        If tombstones rather than keys filled the table, it is rebuilt at the same size.
 
-        :complexity best: O(N*hash(K)) No probing.
-        :complexity worst: O(N*hash(K) + N^2*comp(K)) Lots of probing.
-        Where N is len(self)
+        :complexity best: O(N*hash(K1)) No probing.
+        :complexity worst: O(N*hash(K1) + N^2*comp(K1)) Lots of probing.
+        Where N is the number of top-level keys
         """
         old_array = self.array
-        self.top_size_index += 1
-        if self.top_size_index == len(self.top_size):
-            # Cannot be resized further.
+        if self.top_level_count > self.table_size // 4 and self.top_size_index + 1 < len(self.top_size):
+            self.top_size_index += 1
+        elif self.tombstone_count == 0:
+            # Cannot be resized further, and there are no tombstones to clear.
             return
-        self.array = ArrayR(self.top_size[self.top_size_index])
-        self.count = 0
-
-        for item1 in old_array:
-            if item1 is not None:
-                key1, internal_array = item1
-                for item2 in internal_array.array:
-                    if item2 is not None:
-                        key2, value = item2
-                        self[key1, key2] = value  # re-set
+        self.array = [None] * self.top_size[self.top_size_index]
+        self.tombstone_count = 0
+        table_size = self.table_size
+
+        for item in old_array:
+            if item is not None and item is not TOMBSTONE:
+                # Keys are unique, so just find the first empty slot.
+                pos1 = self.hash1(item[0])
+                while self.array[pos1] is not None:
+                    pos1 += 1
+                    if pos1 == table_size:
+                        pos1 = 0
+                self.array[pos1] = item
 
     @property
     def table_size(self) -> int:
@@ -359,7 +339,7 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         """
         result = ""
         for item in self.array:
-            if item is not None:
+            if item is not None and item is not TOMBSTONE:
                 (key, value) = item
                 result += "(" + str(key) + "," + str(value) + ")\n"
         return result
@@ -1,8 +1,6 @@
 from __future__ import annotations
 from typing import Generic, TypeVar
 
-from data_structures.referential_array import ArrayR
-
 K = TypeVar("K")
 V = TypeVar("V")
 
@@ -11,10 +9,13 @@ class InfiniteHashTable(Generic[K, V]):
     Infinite Hash Table.
 
     Type Arguments:
-        - K:    Key Type. In most cases should be string.
-                Otherwise `hash` should be overwritten.
+        - K:    Key Type. Should be string.
         - V:    Value Type.
 
+    The position of a key on level i is ord(key[i]) % (TABLE_SIZE-1), or the last slot of the table
+    once the key has run out of characters. This is computed inline by each method walking the levels.
+    A slot holds either a (key, value) tuple or the table for the next level.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
@@ -23,14 +24,8 @@ class InfiniteHashTable(Generic[K, V]):
     def __init__(self) -> None:
         assert(self.TABLE_SIZE > 0)
         self.count = 0
-        self.table = ArrayR(self.TABLE_SIZE)
-        self.level = 0
-
+        self.table = [None] * self.TABLE_SIZE
 
-    def hash(self, key: K) -> int:
-        if self.level < len(key):
-            return ord(key[self.level]) % (self.TABLE_SIZE-1)  # returns hash position within the current level
-        return self.TABLE_SIZE-1  # returns hash position on the last level (the end of the table)
 
     def __getitem__(self, key: K) -> V:
         """
@@ -42,76 +37,73 @@ class InfiniteHashTable(Generic[K, V]):
         Worst case: O(N) where N is the length of the key, the key,value pair is set in Nth level of the hash
          table
         """
-
-        copy_table = self.table
-        self.level = 0
-        while self.level <= len(key)-1:
-            pos = self.hash(key)
-            if self.table[pos] is None:
-                self.table = copy_table
+        sz = self.TABLE_SIZE-1
+        key_length = len(key)
+        table = self.table
+        level = 0
+        while level <= key_length:
+            entry = table[ord(key[level]) % sz if level < key_length else sz]
+            if entry is None:
+                raise KeyError("Key doesn't exist!")
+            elif type(entry) is tuple:  # a (key, value) pair, so the walk ends here
+                if entry[0] == key:
+                    return entry[1]
                 raise KeyError("Key doesn't exist!")
-            elif self.table[pos][0] == key:
-                self.table = copy_table
-                return self.table[pos][1]
             else:
-                self.table[pos] = self.table[pos][1]
-                self.level += 1
+                table = entry
+                level += 1
+        raise KeyError("Key doesn't exist!")
 
 
     def __setitem__(self, key: K, value: V) -> None:
         """
         Set an (key, value) pair in our hash table.
 
+        :raises ValueError: when the key lands in the same position as an existing key on every level,
+        so the two can never be told apart (same length, and all remaining characters equal modulo TABLE_SIZE-1).
+
         Best case: O(1), when the (key, value) pair is being set to a position on level 0 of the hash table.
-        Worst case: O(N^2), where N is the length of the key and the key is set in the Nth level of the hash table.
-        At each level, the key is sliced using Python's string slice, which makes a copy of the given string,
-        which takes N iterations, thus O(N*N) = O(N^2).
+        Worst case: O(N), where N is the length of the key and the key is set in the Nth level of the hash table.
+        Each level only needs one position calculation, and at most one existing pair is moved down a level.
         """
-        # level 0
-        copy_table = self.table
-        self.level = 0
-        pos = self.hash(key)
-
-        while self.level <= len(key)-1: # next levels
-            pos = self.hash(key)
-            if self.table[pos] is None:
-                self.table[pos] = (key, value)
+        sz = self.TABLE_SIZE-1
+        key_length = len(key)
+        table = self.table
+        level = 0
+        while level <= key_length:
+            pos = ord(key[level]) % sz if level < key_length else sz
+            entry = table[pos]
+            if entry is None:
+                table[pos] = (key, value)
                 self.count += 1
-                self.table = copy_table
-                return
-            elif self.table[pos][0] == key:
-                self.table[pos] = (key, value)
-                self.table = copy_table
                 return
+            elif type(entry) is tuple:
+                existing_key = entry[0]
+                if existing_key == key:
+                    table[pos] = (key, value)
+                    return
+                existing_length = len(existing_key)
+                # Keys of the same length whose remaining characters all share positions would meet again on
+                # every level, ending up in the same end-of-key slot, so the new pair cannot be placed.
+                if existing_length == key_length and all(
+                        ord(c1) % sz == ord(c2) % sz for c1, c2 in zip(key[level+1:], existing_key[level+1:])):
+                    raise ValueError("Key " + repr(key) + " clashes with " + repr(existing_key) + " on every level!")
+                # there is a key-value pair already, so push it down a level at a time until the keys separate
+                while True:
+                    new_table = [None] * self.TABLE_SIZE
+                    table[pos] = new_table
+                    table = new_table
+                    level += 1
+                    pos = ord(key[level]) % sz if level < key_length else sz
+                    existing_pos = ord(existing_key[level]) % sz if level < existing_length else sz
+                    if pos != existing_pos:
+                        table[existing_pos] = entry
+                        table[pos] = (key, value)
+                        self.count += 1
+                        return
             else:
-                if type(self.table[pos]) is tuple:  # there is a key-value pair already, so need to slice key and
-                    # reinsert it
-                    existing_key, existing_value = self.table[pos]
-                    self.table[pos] = [key[:self.level+1], ArrayR(self.TABLE_SIZE)]
-                    self.table = self.table[pos][1]
-                    self.level += 1
-                    pos_existing_key = self.hash(existing_key)
-                    self.table[pos_existing_key] = (existing_key, existing_value)
-                else:
-                    self.table = self.table[pos][1]
-                    self.level += 1
-
-
-        # position = self.hash(key)
-        #
-        # if self.table[position] is None:
-        #     self.table[position] = ArrayR(self.TABLE_SIZE)
-        #
-        # # Attempt to find the key in our linked list
-        # for index, item in enumerate(self.table[position]):
-        #     if item[0] == key:
-        #         # If found update the data
-        #         self.table[position][index] = (key, value)
-        #         return
-        #
-        # # Otherwise insert it at the beginning
-        # self.table[position].insert(0, (key, value))
-        # self.count += 1
+                table = entry
+                level += 1
 
 
     def __delitem__(self, key: K) -> None:
@@ -122,62 +114,52 @@ class InfiniteHashTable(Generic[K, V]):
 
         Best case: O(1), when the (key,value) pair being deleted is in level 0 of the hash table.
 
-        Worst case: O(N(N+M)), when table can be collapsed all the way to level 0.
+        Worst case: O(N*M), when table can be collapsed all the way to level 0.
         Further Explanation...
-        Deleting the (key, value) pair takes O(N+N), where N is the length of the list returned by
-        get_location (number of levels).
-        Python's list slice makes a copy of the given array, which takes N iterations.
-        Then, the table will need to be indexed until the sequence ends to reach the key, which takes N iterations.
-        Simplified, this takes O(N) time.
-
-        Collapsing the table takes O(N*(N+N+M)) where N is the length of the list returned by get_location (number of
-        levels) and M is the length of the current hash table. For each level of the table, N+N+M operations
-        are performed. Python's list slice makes a copy of the given array, which takes N iterations.
-        Then, the table will need to be indexed until the get_location sequence ends to reach the hash
-        table we need to search, which also takes N iterations. Then that hash table is linearly searched M times before
-        deducing whether or not the hash table can be collapsed.
-        Simplified, this takes O(N*(N+M)) time.
-
-        Thus worst case is O(delete+collapsing) = O(N(N+M))
+        Finding the (key, value) pair takes O(N), where N is the length of the key (number of levels). On the way down,
+        the table and position used on each level are remembered.
+
+        Collapsing then goes back up through the remembered tables, so it doesn't have to walk down from level 0
+        again. Each table is linearly searched, which takes M iterations, where M is the size of the hash table,
+        before deducing whether or not the table can be collapsed. This happens at most once per level, so O(N*M).
+
+        Thus worst case is O(delete+collapsing) = O(N+N*M) = O(N*M)
         """
         # delete
-        copy_table = self.table
-        location_list = self.get_location(key)
-        level = len(location_list)-1
-        for i in location_list[:level]:
-            self.table = self.table[i][1]  # set self.table as table of current level
-        self.table[location_list[level]] = None  # delete the (key,value)
+        sz = self.TABLE_SIZE-1
+        key_length = len(key)
+        table = self.table
+        level = 0
+        path = []  # (table, position) used on each level
+        while True:
+            if level > key_length:
+                raise KeyError("Key doesn't exist!")
+            pos = ord(key[level]) % sz if level < key_length else sz
+            entry = table[pos]
+            if entry is None:
+                raise KeyError("Key doesn't exist!")
+            path.append((table, pos))
+            if type(entry) is tuple:
+                if entry[0] != key:
+                    raise KeyError("Key doesn't exist!")
+                break
+            table = entry
+            level += 1
+        table[pos] = None  # delete the (key,value)
         self.count -= 1
 
         # collapsing
-        tuple_count = 0
-        while level >= 1:
-            self.table = copy_table
-            for i in location_list[:level]:
-                self.table = self.table[i][1]
-            key_count = 0  # counts keys in current table
-            for element in self.table:
+        for level in range(len(path)-1, 0, -1):
+            remaining = None
+            for element in path[level][0]:
                 if element is not None:
-                    if type(element) is tuple:
-                        remaining_tuple = element
-                        tuple_count += 1
-                    else:  # only key remaining
-                        key_count += 1
-                if key_count == 1 and tuple_count == 0 or tuple_count > 1:  # don't collapse table containing key
-                    # with table (table could contain more tuples) or other tuples
-                    self.table = copy_table
-                    return
-            if tuple_count == 1:  # collapse table containing 1 tuple or 1 key with table (that contains 1 tuple)
-                self.table = remaining_tuple
-            level -= 1
-
-        self.table = copy_table
-
-        # level 0
-        if level == 0:
-            if tuple_count == 0:
-                return
-            self.table[location_list[level]] = remaining_tuple
+                    if remaining is not None or type(element) is not tuple:  # don't collapse table containing
+                        # another table or more than one (key, value) pair
+                        return
+                    remaining = element
+            # only one (key, value) pair left, so move it up into the slot of the previous level
+            parent, parent_pos = path[level-1]
+            parent[parent_pos] = remaining
 
 
     def __len__(self) -> int:
@@ -202,24 +184,24 @@ class InfiniteHashTable(Generic[K, V]):
         To obtain every index required to access this key, the hash table will need to be traversed N times.
         """
 
-        copy_table = self.table
-        self.level = 0
+        sz = self.TABLE_SIZE-1
+        key_length = len(key)
+        table = self.table
+        level = 0
         location_list = []
-
-        while self.level <= len(key):
-            pos = self.hash(key)
-            if type(self.table) is int or self.table[pos] is None:  # self.table is an int when it is
-                # value of different key
-                self.table = copy_table
+        while level <= key_length:
+            pos = ord(key[level]) % sz if level < key_length else sz
+            entry = table[pos]
+            if entry is None:
                 raise KeyError("Key doesn't exist!")
-            elif self.table[pos][0] == key and type(self.table[pos]) is tuple:
-                location_list.append(pos)
-                self.table = copy_table
-                return location_list
-            else:
-                location_list.append(pos)
-                self.table = self.table[pos][1]
-                self.level += 1
+            location_list.append(pos)
+            if type(entry) is tuple:
+                if entry[0] == key:
+                    return location_list
+                raise KeyError("Key doesn't exist!")
+            table = entry
+            level += 1
+        raise KeyError("Key doesn't exist!")
 
     def __contains__(self, key: K) -> bool:
         """
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 @dataclass
 class Mountain:
 
+    # Declared by hand rather than with dataclass(slots=True), which needs Python 3.10.
+    __slots__ = ("name", "difficulty_level", "length")
+
     name: str
     difficulty_level: int
     length: int
@@ -13,26 +16,18 @@ class Mountain:
         Overwriting '<' operator to compare 2 mountains length and names.
         other: instance of Mountain class
         """
-        if self.length == other.length:
-            return self.name <= other.name
-        return self.length < other.length
+        return (self.length, self.name) < (other.length, other.name)
 
     def __eq__(self, other: Mountain) -> bool:
         """
         Overwriting '=' operator to compare 2 mountains length and names.
         other: instance of Mountain class
         """
-        if self.length == other.length:
-            return self.name == other.name
+        return (self.length, self.name) == (other.length, other.name)
 
     def __gt__(self, other: Mountain) -> bool:
         """
         Overwriting '>' operator to compare 2 mountains length and names.
         other: instance of Mountain class
         """
-        if self.length == other.length:
-            return self.name >= other.name
-        return self.length > other.length
-
-
-
+        return (self.length, self.name) > (other.length, other.name)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+
 from mountain import Mountain
-from algorithms.mergesort import mergesort, merge
-from algorithms.binary_search import binary_search
 
 class MountainOrganiser:
 
@@ -18,11 +18,15 @@ class MountainOrganiser:
         Finds the rank of the provided mountain given all mountains included so far.
         Raises KeyError if this mountain hasn't been added yet.
 
-        Complexity: Best-case is O(1) if the mountain we are finding is the middle of m_list. Worst-case is O(log(n)), where n is
-        the length of the list. This occurs if the mountain's length is the smallest or largest in the list, so log(n)
-        recursive calls are done.
+        Complexity: Best-case and worst-case are both O(log(n)), where n is the length of the list.
+        bisect_left always halves the search range until it is empty, and is done in C, so each step is one
+        comparison between mountains.
         """
-        return binary_search(self.m_list, mountain)
+        m_list = self.m_list
+        i = bisect_left(m_list, mountain)
+        if i != len(m_list) and m_list[i] == mountain:
+            return i
+        raise KeyError(mountain)
 
 
     def add_mountains(self, mountains: list[Mountain]) -> None:
@@ -30,24 +34,15 @@ class MountainOrganiser:
         Adds a list of mountains to the organiser
 
         Complexity:
-         Best case: O(mlog(m)), where m is the length of the list mountains and there are no existing mountains in
-         m_list so far, so only mergesort is called.
+         Best case: O(m+n), where m is the length of the list mountains and n is the number of elements
+         in m_list so far. This occurs when mountains is already sorted, so Timsort (list.sort) only finds
+         the two sorted runs and merges them.
 
          Worst case: O(mlog(m)+n), where m is the length of the list mountains and n is the number of elements
-         in m_list so far. O(mlog(m)) is the time complexity of mergesort in sorting the new mountains being added.
-         Since this sorted list of mountains is then merged with the existing list of length n,
-         and merge time complexity is  O(k), k = len(l1)+len(l2), then the merge time complexity is
-         O(m+n).
-         So overall worst time complexity is O(mlog(m)+m+n) = O(mlog(m)+n).
+         in m_list so far. m_list is already sorted, so Timsort treats it as a single run and only has to sort
+         the m new mountains, which is O(mlog(m)), before merging the runs in O(m+n).
         """
         # m_list should always be sorted already
-        # add to list: just use mergesort on mountains, then merge mountains and m_list
-        if len(self.m_list) is None:
-            self.m_list = mergesort(mountains)
-        else:
-            add_list = mergesort(mountains)
-            self.m_list = merge(add_list, self.m_list)
-
-
-
-
+        # add to list: extend m_list with mountains, then let Timsort merge the sorted prefix with the new run
+        self.m_list.extend(mountains)
+        self.m_list.sort()
@@ -1,7 +1,7 @@
 import unittest
 from ed_utils.decorators import number
 
-from double_key_table import DoubleKeyTable
+from double_key_table import DoubleKeyTable, TOMBSTONE
 
 class TestDoubleHash(unittest.TestCase):
 
@@ -124,3 +124,66 @@ class TestDoubleHash(unittest.TestCase):
         # with an iterator.
         self.assertRaises(BaseException, lambda: next(key_iterator))
         self.assertRaises(BaseException, lambda: next(value_iterator))
+
+    @number("3.6")
+    def test_delete_in_cluster(self):
+        # Disable resizing / rehashing.
+        dt = DoubleKeyTable(sizes=[12], internal_sizes=[5])
+        dt.hash1 = lambda k: ord(k[0]) % 12
+        dt.hash2 = lambda k, sub_table: ord(k[-1]) % 5
+
+        # Tim, Het and Tom all hash to 0, so they form a cluster in slots 0, 1, 2.
+        dt["Tim", "Jen"] = 1
+        dt["Het", "Liz"] = 2
+        dt["Tom", "Ben"] = 3
+        self.assertEqual(dt._linear_probe("Tom", "Ben", False), (2, 0))
+
+        # Deleting the middle of the cluster must not cut off the keys after it.
+        del dt["Het", "Liz"]
+        self.assertIs(dt.array[1], TOMBSTONE)
+        self.assertEqual(dt._linear_probe("Tom", "Ben", False), (2, 0))
+        self.assertEqual(dt["Tom", "Ben"], 3)
+        self.assertRaises(KeyError, lambda: dt["Het", "Liz"])
+
+        # Adding to a key past the tombstone finds it, rather than creating it again in the tombstone's slot.
+        dt["Tom", "Bob"] = 4
+        self.assertEqual(dt._linear_probe("Tom", "Bob", False)[0], 2)
+        self.assertIs(dt.array[1], TOMBSTONE)
+        self.assertEqual(sorted(dt.keys()), ["Tim", "Tom"])
+        self.assertEqual(set(dt.keys("Tom")), {"Ben", "Bob"})
+        self.assertEqual(len(dt), 3)
+
+        # A new top-level key reuses the tombstone.
+        dt["Tex", "Amy"] = 5
+        self.assertEqual(dt._linear_probe("Tex", "Amy", False)[0], 1)
+        self.assertEqual(dt["Tom", "Bob"], 4)
+        self.assertEqual(len(dt), 4)
+
+    @number("3.7")
+    def test_rehash_tombstones(self):
+        # Only one size, so a rehash can never grow the table.
+        dt = DoubleKeyTable(sizes=[12], internal_sizes=[5])
+        dt.hash1 = lambda k: ord(k[0]) % 12
+        dt.hash2 = lambda k, sub_table: ord(k[-1]) % 5
+
+        # Fill slots 0 to 3, then delete them all, leaving 4 tombstones.
+        for name in ["Tim", "Uma", "Vic", "Wes"]:
+            dt[name, "Jen"] = 1
+        for name in ["Tim", "Uma", "Vic", "Wes"]:
+            del dt[name, "Jen"]
+        self.assertEqual(dt.array[:4], [TOMBSTONE] * 4)
+
+        # Slots 5, 6 and 7 don't probe past a tombstone. The third key takes
+        # keys + tombstones past half the table, so it is rebuilt at the same size.
+        dt["Amy", "Ben"] = 2
+        dt["Bea", "Ben"] = 3
+        self.assertEqual(dt.array[:4], [TOMBSTONE] * 4)
+        dt["Cal", "Ben"] = 4
+        self.assertEqual(dt.table_size, 12)
+        self.assertNotIn(TOMBSTONE, dt.array)
+        self.assertEqual(dt._linear_probe("Amy", "Ben", False)[0], 5)
+        self.assertEqual(dt._linear_probe("Bea", "Ben", False)[0], 6)
+        self.assertEqual(dt._linear_probe("Cal", "Ben", False)[0], 7)
+        self.assertEqual(set(dt.values()), {2, 3, 4})
+        self.assertEqual(len(dt), 3)
+        self.assertRaises(KeyError, lambda: dt["Tim", "Jen"])
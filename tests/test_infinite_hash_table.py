@@ -67,3 +67,47 @@ class TestInfiniteHash(unittest.TestCase):
         ih["lin"] = 10
         self.assertEqual(ih.get_location("lin"), [4])
         self.assertEqual(len(ih), 1)
+
+    @number("4.3")
+    def test_split_keys(self):
+        # A key that ends where other keys split, inserted before and after them.
+        ih = InfiniteHashTable()
+        ih["lin"] = 1
+        ih["linked"] = 2
+        ih["linger"] = 3
+        self.assertEqual(ih["linked"], 2)
+        # Reading must not change where anything is stored.
+        self.assertEqual(ih.get_location("lin"), [4, 1, 6, 26])
+        self.assertEqual(ih["lin"], 1)
+        # A prefix of stored keys that was never inserted itself is not in the table.
+        self.assertRaises(KeyError, lambda: ih["li"])
+        self.assertNotIn("li", ih)
+
+        ih = InfiniteHashTable()
+        ih["linked"] = 2
+        ih["linger"] = 3
+        ih["lin"] = 1
+        self.assertEqual(ih.get_location("lin"), [4, 1, 6, 26])
+        self.assertEqual(ih["lin"], 1)
+        self.assertEqual(ih["linked"], 2)
+        self.assertEqual(ih["linger"], 3)
+        self.assertEqual(len(ih), 3)
+
+    @number("4.4")
+    def test_inseparable_keys(self):
+        ih = InfiniteHashTable()
+        ih["ab0"] = 1
+        # '0' and 'J' share a position (48 % 26 == 74 % 26), and both keys end on the next level.
+        self.assertRaises(ValueError, lambda: ih.__setitem__("abJ", 2))
+        self.assertEqual(ih["ab0"], 1)
+        self.assertEqual(ih.get_location("ab0"), [19])
+        self.assertNotIn("abJ", ih)
+        self.assertEqual(len(ih), 1)
+
+        # A longer key separates from it once "ab0" runs out of characters.
+        ih["abJ0"] = 3
+        self.assertEqual(ih.get_location("ab0"), [19, 20, 22, 26])
+        self.assertEqual(ih.get_location("abJ0"), [19, 20, 22, 22])
+        self.assertEqual(ih["ab0"], 1)
+        self.assertEqual(ih["abJ0"], 3)
+        self.assertEqual(len(ih), 2)
@@ -31,3 +31,17 @@ class TestInfiniteHash(unittest.TestCase):
         self.assertEqual([mo.cur_position(m) for m in [m1, m2, m3, m4, m5, m6, m7, m8, m9]], [1, 8, 3, 0, 4, 2, 6, 7, 5])
 
         self.assertRaises(KeyError, lambda: mo.cur_position(m10))
+
+    @number("6.2")
+    def test_mountain_order(self):
+        # Mountains are ordered by length, then name.
+        self.assertIs(Mountain("a", 1, 2) == Mountain("a", 1, 3), False)
+        self.assertIs(Mountain("a", 1, 2) == Mountain("a", 5, 2), True)
+        self.assertIs(Mountain("a", 1, 2) == Mountain("b", 1, 2), False)
+
+        # '<' and '>' are strict when length and name are equal.
+        self.assertIs(Mountain("a", 1, 2) < Mountain("a", 5, 2), False)
+        self.assertIs(Mountain("a", 1, 2) > Mountain("a", 5, 2), False)
+        self.assertIs(Mountain("a", 1, 2) < Mountain("a", 1, 3), True)
+        self.assertIs(Mountain("b", 1, 2) < Mountain("a", 1, 3), True)
+        self.assertIs(Mountain("a", 1, 2) < Mountain("b", 1, 2), True)
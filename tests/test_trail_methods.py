@@ -1,8 +1,9 @@
+import random
 import unittest
 from ed_utils.decorators import number
 
 from mountain import Mountain
-from trail import Trail, TrailSeries, TrailSplit, TrailStore
+from trail import Trail, TrailSeries, TrailSplit, TrailStore, TrailBuilder
 
 class TestTrailMethods(unittest.TestCase):
 
@@ -57,3 +58,97 @@ class TestTrailMethods(unittest.TestCase):
             self.top_bot, self.top_top, self.top_mid,
             self.bot_one, self.bot_two, self.final
         ])))
+
+    @number("7.2")
+    def test_builder(self):
+        self.load_example()
+
+        builder = TrailBuilder()
+        builder.open_branch()
+        builder.open_branch()
+        builder.add_mountain(self.top_top)
+        builder.choose_bottom()
+        builder.add_mountain(self.top_bot)
+        builder.close_branch()
+        builder.add_mountain(self.top_mid)
+        builder.choose_bottom()
+        builder.add_mountain(self.bot_one)
+        builder.open_branch()
+        builder.add_mountain(self.bot_two)
+        builder.close_branch()
+        builder.close_branch()
+        builder.add_mountain(self.final)
+
+        self.assertEqual(builder.build(), self.trail)
+
+        # Moving within or closing a split needs one to be open.
+        self.assertRaises(ValueError, builder.choose_top)
+        self.assertRaises(ValueError, builder.choose_bottom)
+        self.assertRaises(ValueError, builder.close_branch)
+
+    def all_paths(self, trail: Trail) -> list[list[Mountain]]:
+        """Every path through the trail, top branch first, found by brute force."""
+        store = trail.store
+        if store is None:
+            return [[]]
+        if isinstance(store, TrailSeries):
+            return [[store.mountain] + path for path in self.all_paths(store.following)]
+        branch_paths = self.all_paths(store.path_top) + self.all_paths(store.path_bottom)
+        return [branch + follow for branch in branch_paths for follow in self.all_paths(store.path_follow)]
+
+    def random_trail(self, rng: random.Random, depth: int = 0) -> Trail:
+        trail = Trail(None)
+        for _ in range(rng.randint(0, 3)):
+            if depth < 3 and rng.random() < 0.4:
+                trail = Trail(TrailSplit(self.random_trail(rng, depth + 1), self.random_trail(rng, depth + 1), trail))
+            else:
+                trail = Trail(TrailSeries(Mountain("m" + str(rng.randint(0, 99)), 1, 1), trail))
+        return trail
+
+    def assert_paths(self, trail: Trail, k: int, expected: list[list[Mountain]]) -> None:
+        """length_k_paths gives exactly the expected paths, in order, comparing mountains by identity."""
+        res = trail.length_k_paths(k)
+        self.assertEqual([list(map(id, path)) for path in res], [list(map(id, path)) for path in expected])
+
+    @number("7.3")
+    def test_length_k_paths_cases(self):
+        a, b, c, d, f = (Mountain(name, 1, 1) for name in "abcdf")
+
+        # Empty trail: one path of no mountains.
+        self.assert_paths(Trail(None), 0, [[]])
+        self.assert_paths(Trail(None), 1, [])
+
+        # k longer than the longest path, and shorter than the shortest.
+        self.load_example()
+        self.assert_paths(self.trail, 4, [])
+        self.assert_paths(self.trail, 1, [])
+        self.assert_paths(self.trail, 2, [[self.bot_one, self.final]])
+
+        # A split with empty top and bottom branches gives two paths.
+        empty_branches = Trail(TrailSeries(a, Trail(TrailSplit(Trail(None), Trail(None), Trail(TrailSeries(b, Trail(None)))))))
+        self.assert_paths(empty_branches, 2, [[a, b], [a, b]])
+        self.assert_paths(empty_branches, 1, [])
+
+        # A nested split in the top branch, and an optional mountain in a split on the follow path.
+        # Paths come out in top-first order.
+        trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(a, Trail(TrailSeries(b, Trail(None))))),
+                Trail(TrailSeries(c, Trail(None))),
+                Trail(None),
+            )),
+            Trail(TrailSeries(d, Trail(None))),
+            Trail(TrailSplit(Trail(TrailSeries(f, Trail(None))), Trail(None), Trail(None))),
+        ))
+        self.assert_paths(trail, 2, [[a, b], [c, f], [d, f]])
+        self.assert_paths(trail, 3, [[a, b, f]])
+        self.assert_paths(trail, 1, [[c], [d]])
+
+    @number("7.4")
+    def test_length_k_paths_brute_force(self):
+        rng = random.Random(2023)
+        for _ in range(500):
+            trail = self.random_trail(rng)
+            paths = self.all_paths(trail)
+            for k in range(8):
+                self.assert_paths(trail, k, [path for path in paths if len(path) == k])
@@ -1,10 +1,21 @@
+import itertools
 import unittest
 from ed_utils.decorators import number
 
 from mountain import Mountain
-from trail import Trail, TrailSeries, TrailSplit, TrailStore
+from trail import Trail, TrailSeries, TrailSplit, TrailStore, OP_MOUNTAINS, OP_BRANCH, OP_JUMP
 from personality import WalkerPersonality, TopWalker, BottomWalker, LazyWalker
 
+class ChoiceWalker(WalkerPersonality):
+    """Answers each branch selection from a fixed list of choices, in order."""
+    def __init__(self, choices) -> None:
+        super().__init__()
+        self.choices = list(choices)
+        self.count = 0
+    def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+        self.count += 1
+        return self.choices[self.count - 1]
+
 class TestTrailMethods(unittest.TestCase):
 
     def load_example(self):
@@ -59,3 +70,112 @@ class TestTrailMethods(unittest.TestCase):
         self.trail.follow_path(cw)
 
         self.assertListEqual(cw.mountains, [self.bot_one, self.bot_two, self.final])
+
+    def assert_compiled_matches(self, trail: Trail) -> None:
+        """Every way of choosing branches visits the same mountains whether the trail is compiled or not."""
+        program = trail.compile()
+        for choices in itertools.product([True, False], repeat=4):
+            expected = ChoiceWalker(choices)
+            trail.follow_path(expected)
+            got = ChoiceWalker(choices)
+            program.follow_path(got)
+            self.assertListEqual(got.mountains, expected.mountains)
+            self.assertEqual(got.count, expected.count)
+        for walker in (TopWalker, BottomWalker, LazyWalker):
+            expected = walker()
+            trail.follow_path(expected)
+            got = walker()
+            program.follow_path(got)
+            self.assertListEqual(got.mountains, expected.mountains)
+
+    @number("2.3")
+    def test_compiled_walk(self):
+        a, b, c, d = (Mountain(name, 1, 1) for name in "abcd")
+
+        # Nested splits, with an empty bottom branch in the bottom split.
+        self.load_example()
+        self.assert_compiled_matches(self.trail)
+
+        # Empty trail.
+        self.assert_compiled_matches(Trail(None))
+
+        # Empty top and bottom branches.
+        empty_branches = Trail(TrailSplit(Trail(None), Trail(None), Trail(TrailSeries(a, Trail(None)))))
+        self.assert_compiled_matches(empty_branches)
+        tw = TopWalker()
+        empty_branches.compile().follow_path(tw)
+        self.assertListEqual(tw.mountains, [a])
+
+        # A split at the very start and at the very end of the trail.
+        ends = Trail(TrailSplit(
+            Trail(TrailSeries(a, Trail(None))),
+            Trail(None),
+            Trail(TrailSeries(b, Trail(TrailSplit(
+                Trail(TrailSeries(c, Trail(None))),
+                Trail(TrailSeries(d, Trail(None))),
+                Trail(None),
+            )))),
+        ))
+        self.assert_compiled_matches(ends)
+        cw = ChoiceWalker([False, False])
+        ends.compile().follow_path(cw)
+        self.assertListEqual(cw.mountains, [b, d])
+
+    @number("2.4")
+    def test_compiled_runs(self):
+        a, b, c, d = (Mountain(name, 1, 1) for name in "abcd")
+        # a, then a split with b on top and nothing on the bottom, then a run of c and d after the split.
+        trail = Trail(TrailSeries(a, Trail(TrailSplit(
+            Trail(TrailSeries(b, Trail(None))),
+            Trail(None),
+            Trail(TrailSeries(c, Trail(TrailSeries(d, Trail(None))))),
+        ))))
+        program = trail.compile()
+
+        # The run before the split is cut at the split, and c, d start a new run at the jump target.
+        self.assertListEqual(program.code, [
+            OP_MOUNTAINS, 0, 1,  # 0: a
+            OP_BRANCH, 0, 11,    # 3: bottom branch (empty) starts at 11
+            OP_MOUNTAINS, 1, 2,  # 6: b
+            OP_JUMP, 11,         # 9: skip the bottom branch
+            OP_MOUNTAINS, 2, 4,  # 11: c, d
+        ])
+        self.assertListEqual(program.mountains, [a, b, c, d])
+
+        tw = TopWalker()
+        bw = BottomWalker()
+        program.follow_path(tw)
+        program.follow_path(bw)
+        self.assertListEqual(tw.mountains, [a, b, c, d])
+        self.assertListEqual(bw.mountains, [a, c, d])
+
+    @number("2.5")
+    def test_follow_with_choices(self):
+        w, x, y, z, p, q = (Mountain(name, 1, 1) for name in "wxyzpq")
+        # The top branch holds a nested split, whose choice comes before the split on the outer follow path.
+        trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(x, Trail(None))),
+                Trail(TrailSeries(y, Trail(None))),
+                Trail(TrailSeries(z, Trail(None))),
+            )),
+            Trail(TrailSeries(w, Trail(None))),
+            Trail(TrailSplit(
+                Trail(TrailSeries(p, Trail(None))),
+                Trail(TrailSeries(q, Trail(None))),
+                Trail(None),
+            )),
+        ))
+        program = trail.compile()
+
+        # Bit 0 takes the outer top branch, bit 1 (clear) the nested bottom branch, bit 2 the top of the last split.
+        out = []
+        program.follow_with_choices(0b101, out)
+        self.assertListEqual(out, [y, z, p])
+
+        for choices in range(8):
+            walker = ChoiceWalker(bool(choices >> i & 1) for i in range(3))
+            trail.follow_path(walker)
+            out = []
+            program.follow_with_choices(choices, out)
+            self.assertListEqual(out, walker.mountains)
@@ -1,13 +1,11 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from mountain import Mountain
 
 from typing import TYPE_CHECKING, Union
 from typing import List
 
-from data_structures.linked_stack import LinkedStack
-
 # Avoid circular imports for typing.
 if TYPE_CHECKING:
     from personality import WalkerPersonality
@@ -42,8 +40,6 @@ class TrailSeries:
     mountain: Mountain
     following: Trail 
 
-    mountain_list = [Mountain] # use list
-
     def remove_mountain(self) -> TrailStore: 
         """Removes the mountain at the beginning of this series."""
 
@@ -86,6 +82,11 @@ class TrailSeries:
 
 TrailStore = Union[TrailSplit, TrailSeries, None]
 
+# Trail, TrailSeries and TrailSplit objects are edited in place by the GUI (draw_trails.py replaces `store`,
+# `following` and `path_*` attributes, and attaches *_box attributes for layout). So nodes are not interned
+# (equal subtrails are not merged into one object), and nothing derived from a node's children is cached on
+# the node, as an edit would leave it stale.
+
 @dataclass
 class Trail:
     store: TrailStore = None
@@ -106,35 +107,64 @@ class Trail:
         worst-case, it is O(n) where n is the number of mountains in the trail. This will occur when there is only one long 
         trail and no splits as all the mountains are in the same Trail.
         """
-        copy_og_store = self.store
-        stack_follow = LinkedStack()
+        if self.store is None:
+            return  # empty trail, nothing to follow
+        cur = self.store  # walks the trail, so self.store is never modified
+        stack_follow = []  # list used as a stack, push/pop at the end
+        series = TrailSeries  # local, so each type check is one pointer compare with no global lookup
+        # bound methods as locals, so the loop does no attribute lookups to call them
+        add = personality.add_mountain
+        select = personality.select_branch
+        push = stack_follow.append
+        pop = stack_follow.pop
         while True:
 
-            if isinstance(self.store, TrailSeries):  # add mountain, then set following trail store as current store
-                personality.add_mountain(self.store.mountain)
-                self.store = self.store.following.store
-
-            elif isinstance(self.store, TrailSplit):  # based on selected branch, set that branch's trail store as
-                # current trail store. Store path following the split in stack
-                is_top = personality.select_branch(self.store.path_top, self.store.path_bottom)
-                stack_follow.push(self.store.path_follow.store)
-                if is_top:
-                    self.store = self.store.path_top.store
-                else:
-                    self.store = self.store.path_bottom.store
-
-            else:  # store is None
-                if stack_follow.is_empty():
-                    self.store = copy_og_store  # restarts the Trail, so that next time follow_path is called,
-                    # the instance stores the entire trail, not None
+            if cur is None:
+                if not stack_follow:
                     break  # trail end
                 else:
-                    self.store = stack_follow.pop()  # Last trail in is first current store
+                    cur = pop()  # Last trail in is first current store
+
+            elif type(cur) is series:  # TrailSeries: add mountain, then move on to the following trail store
+                add(cur.mountain)
+                cur = cur.following.store
+                if type(cur) is series:  # unrolled: take a second mountain in series in the same pass
+                    add(cur.mountain)
+                    cur = cur.following.store
+
+            else:  # TrailSplit: based on selected branch, move on to that branch's trail store.
+                # Store path following the split in stack
+                branches = (cur.path_top, cur.path_bottom)
+                push(cur.path_follow.store)
+                cur = branches[not select(*branches)].store  # index 0 is top, 1 is bottom
+
+    def compile(self) -> TrailProgram:
+        """
+        Flattens the trail into a TrailProgram, which can be followed without walking the Trail objects.
+        The program is a snapshot, so it needs to be compiled again after the trail is edited.
+        Complexity: O(n), where n is the number of mountains and splits in the trail.
+        """
+        return TrailProgram.from_store(self.store)
 
 
     def collect_all_mountains(self) -> list[Mountain]:
-        """Returns a list of all mountains on the trail."""
-        pass
+        """
+        Returns a list of all mountains on the trail.
+        The result is worked out on every call rather than cached on the trail, as the trail can be edited in place.
+        Complexity: O(n), where n is the number of mountains and splits in the trail. Each store is visited once.
+        """
+        mountains = []
+        stack = [self.store]  # stores still to visit, list used as a stack
+        while stack:
+            cur = stack.pop()
+            while type(cur) is TrailSeries:
+                mountains.append(cur.mountain)
+                cur = cur.following.store
+            if cur is not None:  # TrailSplit: visit the top branch, then the bottom branch, then the following path
+                stack.append(cur.path_follow.store)
+                stack.append(cur.path_bottom.store)
+                stack.append(cur.path_top.store)
+        return mountains
 
     def length_k_paths(self, k) -> list[list[Mountain]]: # Input to this should not exceed k > 50, at most 5 branches.
         """
@@ -142,5 +172,260 @@ class Trail:
         Paths are represented as lists of mountains.
 
         Paths are unique if they take a different branch, even if this results in the same set of mountains.
+
+        The fewest and most mountains that can follow each store are worked out first, and kept in a dict for
+        this call only, since the trail can be edited between calls. Paths are then walked top branch first.
+        A walk stops as soon as the mountains still needed fall outside the fewest and most that the rest of
+        the walk (the current store plus the follow paths still pending) can supply.
+        The path being walked is written into one list of size k, which is only copied out once complete.
+
+        Complexity: O(n + w), where n is the number of mountains and splits in the trail and w is the work of
+        the walks that survive pruning. Each returned path is copied out once, in O(k). In the worst case,
+        every combination of branches is walked, which is O(2^s * n) for s splits.
+        """
+        bounds = {}  # id(store) -> (fewest, most) mountains from that store to the end of its trail
+        path = [None] * k  # the path being walked
+        result = []
+
+        def length_bounds(store: TrailStore) -> tuple[int, int]:
+            key = id(store)
+            if key in bounds:
+                return bounds[key]
+            mountains = 0
+            cur = store
+            while type(cur) is TrailSeries:  # run of mountains in series
+                mountains += 1
+                cur = cur.following.store
+            if cur is None:
+                lengths = (mountains, mountains)
+            else:
+                top_min, top_max = length_bounds(cur.path_top.store)
+                bottom_min, bottom_max = length_bounds(cur.path_bottom.store)
+                follow_min, follow_max = length_bounds(cur.path_follow.store)
+                lengths = (mountains + min(top_min, bottom_min) + follow_min,
+                           mountains + max(top_max, bottom_max) + follow_max)
+            bounds[key] = lengths
+            return lengths
+
+        def walk(store: TrailStore, k: int, depth: int, pending: list, pending_min: int, pending_max: int) -> None:
+            """
+            Writes the mountains from store into path[depth:], then carries on along the pending follow paths,
+            which can supply between pending_min and pending_max mountains between them.
+            """
+            fewest, most = length_bounds(store)
+            if k < fewest + pending_min or k > most + pending_max:
+                return  # can't end with exactly k mountains
+            while type(store) is TrailSeries:
+                path[depth] = store.mountain
+                depth += 1
+                k -= 1
+                store = store.following.store
+            if store is None:
+                if pending:
+                    follow = pending.pop()
+                    follow_min, follow_max = length_bounds(follow)
+                    walk(follow, k, depth, pending, pending_min - follow_min, pending_max - follow_max)
+                    pending.append(follow)
+                else:
+                    result.append(path[:depth])  # the bounds checked above are exact here, so k is 0
+                return
+            follow = store.path_follow.store
+            follow_min, follow_max = length_bounds(follow)
+            pending.append(follow)
+            walk(store.path_top.store, k, depth, pending, pending_min + follow_min, pending_max + follow_max)
+            walk(store.path_bottom.store, k, depth, pending, pending_min + follow_min, pending_max + follow_max)
+            pending.pop()
+
+        walk(self.store, k, 0, [], 0, 0)
+        return result
+
+
+# Instructions of a TrailProgram, each followed by its operands.
+OP_MOUNTAINS = 0  # OP_MOUNTAINS, start, stop: visit mountains[start:stop], a run of mountains in series
+OP_BRANCH = 1     # OP_BRANCH, branch index, bottom pc: carry on for the top branch, jump to bottom pc otherwise
+OP_JUMP = 2       # OP_JUMP, pc: jump, used at the end of a top branch to skip over the bottom branch
+
+@dataclass
+class TrailProgram:
+    """
+    A trail flattened into a list of integer instructions.
+
+    For a split, the top branch is laid out first and ends with a jump past the bottom branch,
+    which falls through to the path following the split:
+
+    BRANCH b bot | top branch | JUMP follow | bot: bottom branch | follow: following path
+    """
+
+    code: list[int] = field(default_factory=list)
+    mountains: list[Mountain] = field(default_factory=list)
+    branches: list[tuple[Trail, Trail]] = field(default_factory=list)  # (path_top, path_bottom) of each split
+
+    @classmethod
+    def from_store(cls, store: TrailStore) -> TrailProgram:
+        """
+        Creates the program for a trail store.
+        Complexity: O(n), where n is the number of mountains and splits from the store onwards.
+        """
+        program = cls()
+        program._emit(store)
+        return program
+
+    def _emit(self, store: TrailStore) -> None:
+        """
+        Appends the instructions for a trail store, used by from_store on an empty program.
+        Only recurses into top and bottom branches, so the depth is the nesting of splits, not the trail length.
+        """
+        code = self.code
+        run_pc = None  # OP_MOUNTAINS instruction that the next mountain in series can be added onto
+        while store is not None:
+            if type(store) is TrailSeries:
+                if run_pc is None:
+                    run_pc = len(code)
+                    code += (OP_MOUNTAINS, len(self.mountains), len(self.mountains))
+                code[run_pc + 2] += 1
+                self.mountains.append(store.mountain)
+                store = store.following.store
+
+            else:  # TrailSplit
+                run_pc = None  # the following path is jumped to, so it starts a new run
+                branch_pc = len(code)
+                code += (OP_BRANCH, len(self.branches), 0)
+                self.branches.append((store.path_top, store.path_bottom))
+                self._emit(store.path_top.store)
+                jump_pc = len(code)
+                code += (OP_JUMP, 0)
+                code[branch_pc + 2] = len(code)  # bottom branch starts here
+                self._emit(store.path_bottom.store)
+                code[jump_pc + 1] = len(code)  # following path starts here
+                store = store.path_follow.store
+
+    def follow_path(self, personality: WalkerPersonality) -> None:
+        """
+        Follow the compiled path and add mountains according to a personality, same as Trail.follow_path.
+        Complexity: O(n), where n is the number of mountains and splits on the path taken.
+        """
+        code = self.code
+        mountains = self.mountains
+        branches = self.branches
+        add_mountain = personality.add_mountain
+        pc = 0
+        while pc < len(code):
+            op = code[pc]
+            if op == OP_MOUNTAINS:
+                for mountain in mountains[code[pc + 1]:code[pc + 2]]:
+                    add_mountain(mountain)
+                pc += 3
+            elif op == OP_BRANCH:
+                path_top, path_bottom = branches[code[pc + 1]]
+                if personality.select_branch(path_top, path_bottom):
+                    pc += 3
+                else:
+                    pc = code[pc + 2]
+            else:  # OP_JUMP
+                pc = code[pc + 1]
+
+    def follow_with_choices(self, choices: int, out: list[Mountain]) -> None:
+        """
+        Follow the compiled path with the branch choices given up front, appending the mountains to out.
+        Bit i of choices, counting from the lowest, is the choice at the i-th split reached:
+        1 takes the top branch and 0 the bottom branch, like the result of select_branch.
+        Complexity: O(n), where n is the number of mountains and splits on the path taken.
+        """
+        code = self.code
+        mountains = self.mountains
+        pc = 0
+        while pc < len(code):
+            op = code[pc]
+            if op == OP_MOUNTAINS:
+                out.extend(mountains[code[pc + 1]:code[pc + 2]])
+                pc += 3
+            elif op == OP_BRANCH:
+                if choices & 1:
+                    pc += 3
+                else:
+                    pc = code[pc + 2]
+                choices >>= 1
+            else:  # OP_JUMP
+                pc = code[pc + 1]
+
+
+class TrailBuilder:
+    """
+    Builds a trail from front to back, then creates all of its Trail objects in one go.
+    Adding n mountains is n list appends, and build() allocates one TrailSeries and one Trail per mountain,
+    rather than the new wrappers that every add_* call creates.
+
+    builder = TrailBuilder()
+    builder.add_mountain(a)
+    builder.open_branch()     # mountains now go on the top branch
+    builder.add_mountain(b)
+    builder.choose_bottom()   # mountains now go on the bottom branch
+    builder.close_branch()    # mountains now go after the split
+    builder.add_mountain(c)
+    trail = builder.build()
+    """
+
+    def __init__(self) -> None:
+        self.items = []  # mountains, and a (top items, bottom items) pair for each split, in trail order
+        self.open_splits = []  # (items the split was added to, split) for every split not closed yet
+        self.cur_items = self.items
+
+    def add_mountain(self, mountain: Mountain) -> None:
+        """Adds a mountain to the end of the current path."""
+        self.cur_items.append(mountain)
+
+    def open_branch(self) -> None:
+        """Adds a split to the end of the current path, and moves onto its top branch."""
+        split = ([], [])
+        self.cur_items.append(split)
+        self.open_splits.append((self.cur_items, split))
+        self.cur_items = split[0]
+
+    def choose_top(self) -> None:
+        """
+        Moves onto the top branch of the innermost open split.
+
+        :raises ValueError: when no split is open.
+        """
+        self._check_open()
+        self.cur_items = self.open_splits[-1][1][0]
+
+    def choose_bottom(self) -> None:
+        """
+        Moves onto the bottom branch of the innermost open split.
+
+        :raises ValueError: when no split is open.
+        """
+        self._check_open()
+        self.cur_items = self.open_splits[-1][1][1]
+
+    def close_branch(self) -> None:
+        """
+        Closes the innermost open split, so mountains are added after it.
+
+        :raises ValueError: when no split is open.
+        """
+        self._check_open()
+        self.cur_items = self.open_splits.pop()[0]
+
+    def _check_open(self) -> None:
+        """Raises a ValueError if there is no open split to move within or close."""
+        if not self.open_splits:
+            raise ValueError("No branch is open!")
+
+    def build(self) -> Trail:
+        """
+        Creates the trail. Any splits still open are treated as closed.
+        Complexity: O(n), where n is the number of mountains and splits added.
         """
-        pass
+        return self._build_items(self.items)
+
+    def _build_items(self, items: list) -> Trail:
+        """Creates the trail for a list of items, from the back so that each following trail already exists."""
+        trail = Trail(None)
+        for item in reversed(items):
+            if type(item) is tuple:
+                trail = Trail(TrailSplit(self._build_items(item[0]), self._build_items(item[1]), trail))
+            else:
+                trail = Trail(TrailSeries(item, trail))
+        return trail